@@ -1,9 +1,26 @@
 import os
 import json
+import functools
+import csv
+import io
+import itertools
+import mmap
+import multiprocessing
+import uuid
+import orjson
 import pandas as pd
-import xml.etree.ElementTree as ET
+import polars as pl
+from lxml import etree
 import re
-from flask import Flask, render_template, request, send_from_directory, flash, redirect, url_for
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+from flask import Flask, render_template, request, send_from_directory, flash, redirect, url_for, jsonify
+from redis import Redis
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
 from werkzeug.utils import secure_filename
 
 # --- Configuration ---
@@ -11,69 +28,475 @@ from werkzeug.utils import secure_filename
 # It's good practice to use absolute paths.
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 PROCESSED_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'processed')
+# Uploads are processed by RQ workers (run `rq worker`) through this Redis.
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+# How long, in seconds, a worker may spend on one file before RQ stops it.
+JOB_TIMEOUT = 60 * 60
 ALLOWED_EXTENSIONS = {'txt', 'log', 'json', 'xml'}
+# The same extensions as '.ext' suffixes, ready for str.endswith.
+ALLOWED_SUFFIXES = tuple(sorted('.' + ext for ext in ALLOWED_EXTENSIONS))
+# Files are parsed and written out this many rows at a time, so large
+# uploads never have to fit in memory at once.
+CHUNK_SIZE = 50000
+# Log files larger than this are split into blocks of at most this many bytes
+# and parsed in parallel, one block per worker process at a time.
+PARSE_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Line formats tried by parse_log_file, in order. The first one that matches
+# a line wins. You will likely need to add patterns for your own log formats.
+LOG_PATTERNS = [
+    # Captures IP, timestamp, request method/path, status, and size.
+    # This is a common pattern for web server logs (e.g., Apache, Nginx).
+    r'(?P<ip>\S+) \S+ \S+ \[(?P<timestamp>.*?)\] "(?P<request>.*?)" (?P<status>\d{3}) (?P<size>\S+)',
+]
 
 # --- App Initialization ---
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['PROCESSED_FOLDER'] = PROCESSED_FOLDER
+app.config['REDIS_URL'] = REDIS_URL
+app.config['JOB_TIMEOUT'] = JOB_TIMEOUT
 app.config['SECRET_KEY'] = 'supersecretkey' # Change this in a real application
+queue = Queue(connection=Redis.from_url(app.config['REDIS_URL']))
 
 # --- Helper Functions ---
 
 def allowed_file(filename):
     """Checks if the file's extension is in the ALLOWED_EXTENSIONS set."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
 
-def parse_log_file(file_path):
+@functools.lru_cache(maxsize=128)
+def literal_runs(pattern):
     """
-    A generic log parser. This is a basic example.
-    Real-world log files can be very complex. This function tries to extract
-    common patterns like IP addresses, timestamps, and request methods.
-    You will likely need to customize this regex for your specific log formats.
+    Returns the runs of literal text at the top level of a regex, in order.
+    Every string the pattern matches contains all of them.
     """
-    # Example Regex: Captures IP, timestamp, request method/path, status, and size.
-    # This is a common pattern for web server logs (e.g., Apache, Nginx).
-    log_pattern = re.compile(r'(?P<ip>\S+) \S+ \S+ \[(?P<timestamp>.*?)\] "(?P<request>.*?)" (?P<status>\d{3}) (?P<size>\S+)')
-    data = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & re.IGNORECASE:
+        return ()
+    runs, run = [], ''
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            run += chr(arg)
+        else:
+            if run:
+                runs.append(run)
+            run = ''
+    if run:
+        runs.append(run)
+    return tuple(runs)
+
+# Categories that never match a newline.
+SINGLE_LINE_CATEGORIES = {sre_parse.CATEGORY_DIGIT, sre_parse.CATEGORY_WORD, sre_parse.CATEGORY_NOT_SPACE}
+
+def stays_on_line(items, dotall=False):
+    r"""
+    Checks that a parsed regex can never match a newline, using only
+    constructs whose behaviour doesn't depend on where the subject ends.
+    Anything unusual (lookarounds, backreferences, \A, \Z) is rejected.
+    """
+    for op, arg in items:
+        if op is sre_parse.LITERAL:
+            if arg == ord('\n'):
+                return False
+        elif op is sre_parse.ANY:
+            if dotall:
+                return False
+        elif op is sre_parse.IN:
+            for item_op, item_arg in arg:
+                if item_op is sre_parse.LITERAL:
+                    if item_arg == ord('\n'):
+                        return False
+                elif item_op is sre_parse.RANGE:
+                    if item_arg[0] <= ord('\n') <= item_arg[1]:
+                        return False
+                elif item_op is not sre_parse.CATEGORY or item_arg not in SINGLE_LINE_CATEGORIES:
+                    return False
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            if not stays_on_line(arg[2], dotall):
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, sub = arg
+            if add_flags or del_flags or not stays_on_line(sub, dotall):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(stays_on_line(branch, dotall) for branch in arg[1]):
+                return False
+        elif op is sre_parse.AT:
+            if arg not in (sre_parse.AT_BEGINNING, sre_parse.AT_END, sre_parse.AT_BOUNDARY, sre_parse.AT_NON_BOUNDARY):
+                return False
+        else:
+            return False
+    return True
+
+@functools.lru_cache(maxsize=128)
+def line_scanner(pattern):
+    """
+    Returns a bytes regex that finds the lines a pattern matches when run
+    with finditer over a whole block, or None when that wouldn't give the
+    same rows as matching line by line: the pattern isn't ASCII, or could
+    match an empty string or run past the end of a line.
+    """
+    if not pattern.isascii():
+        return None
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & ~re.UNICODE or parsed.getwidth()[0] == 0:
+        return None
+    if not stays_on_line(parsed):
+        return None
+    try:
+        return re.compile(b'^(?:' + pattern.encode('ascii') + b')', re.MULTILINE)
+    except re.error:
+        return None
+
+# Bytes whose meaning differs between bytes and str regexes, or between
+# reading a file in binary and in text mode: carriage returns, the
+# \x1c-\x1f separators str patterns treat as whitespace, and non-ASCII.
+SCAN_UNSAFE_BYTES = re.compile(rb'[\r\x1c-\x1f\x80-\xff]')
+
+def compile_log_patterns(patterns):
+    """
+    Compiles the candidate line formats, in order. Each pattern is a
+    (compiled_regex, names, literals) tuple, where names are its named groups
+    in order and literals are substrings a line must contain for the pattern
+    to have a chance.
+    """
+    entries = []
+    for pattern in patterns:
+        regex = re.compile(pattern)
+        entries.append((regex, tuple(regex.groupindex), literal_runs(pattern)))
+    return entries
+
+DEFAULT_LOG_MATCHERS = compile_log_patterns(LOG_PATTERNS)
+
+def iter_chunks(records, chunk_size=CHUNK_SIZE):
+    """
+    Groups an iterable of row dicts into DataFrames of up to chunk_size rows.
+    Values are kept as the Python objects they were decoded to, so a column
+    is written the same way whichever chunk it lands in, instead of pandas
+    guessing a dtype (e.g. float for ints with gaps) from each chunk alone.
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= chunk_size:
+            yield pd.DataFrame(batch, dtype=object)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, dtype=object)
+
+def split_file(file_path, block_size=PARSE_BLOCK_SIZE):
+    """
+    Splits a file into (start, end) byte ranges that each end on a line
+    boundary. Files larger than block_size are cut into at least one range
+    per CPU, and no range is much larger than block_size.
+    """
+    size = os.stat(file_path).st_size
+    if size > block_size:
+        block_size = min(block_size, -(-size // (os.cpu_count() or 1)))
+    ranges = []
+    with open(file_path, 'rb') as f:
+        start = 0
+        while start < size:
+            # Move to the end of the line the block would otherwise cut.
+            f.seek(start + block_size - 1)
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def parse_block(file_path, patterns, byte_range, fallback=False):
+    """
+    Matches the lines in one byte range of a log file against the patterns.
+    Returns the parsed columns and whether any line matched. Large files are
+    parsed with this in worker processes, one call per range. With fallback
+    set, a block where nothing matched comes back as one 'message' per line
+    instead.
+    """
+    start, end = byte_range
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        scanner = line_scanner(patterns[0]) if len(patterns) == 1 else None
+        if scanner is not None and not SCAN_UNSAFE_BYTES.search(mm, start, end):
+            columns, matched = scan_lines(mm, start, end, scanner)
+            text = None
+        else:
+            text = mm[start:end].decode('utf-8', errors='ignore')
+            columns, matched = match_lines(text, patterns)
+        if fallback and not matched:
+            if text is None:
+                text = mm[start:end].decode('ascii')
+            columns = {'message': [line.strip() for line in io.StringIO(text, newline=None)]}
+    return columns, matched
+
+def scan_lines(mm, start, end, scanner):
+    """
+    Finds the lines between start and end that a line_scanner matches,
+    letting re walk the block instead of looping over its lines in Python.
+    Only used on ASCII blocks, so every line is decoded as ASCII, and only
+    the fields of matching lines get decoded at all.
+    """
+    names = list(scanner.groupindex)
+    columns = {name: [] for name in names}
+    appends = [(scanner.groupindex[name], columns[name].append) for name in names]
+    matched = False
+    for match in scanner.finditer(mm, start, end):
+        for group, append in appends:
+            value = match.group(group)
+            append(None if value is None else value.decode('ascii'))
+        matched = True
+    return (columns if matched else {}), matched
+
+def match_lines(text, patterns):
+    """
+    Matches each line of the text against the patterns. Returns the parsed
+    rows as a dict of equally long column lists, in the order the columns
+    were first seen, and whether any line matched.
+    """
+    columns = {}
+    rows = 0
+    # StringIO splits lines the same way reading the file in text mode does.
+    lines = io.StringIO(text, newline=None)
+    if patterns == LOG_PATTERNS:
+        candidates = DEFAULT_LOG_MATCHERS
+    else:
+        candidates = compile_log_patterns(patterns)
+    for line in lines:
+        for log_pattern, names, literals in candidates:
+            # Checking the literals with a plain substring test is much
+            # cheaper than letting the regex engine fail on lines that
+            # can't possibly match.
+            if not all(t in line for t in literals):
+                continue
             match = log_pattern.match(line)
             if match:
-                data.append(match.groupdict())
-    if not data:
-        # Fallback for unstructured logs: treat each line as a single message.
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            data = [{'message': line.strip()} for line in f]
-    return pd.DataFrame(data)
+                for name in names:
+                    if name not in columns:
+                        columns[name] = [None] * rows
+                    columns[name].append(match.group(name))
+                rows += 1
+                if len(columns) > len(names):
+                    # Pad the columns of the other patterns.
+                    for values in columns.values():
+                        if len(values) < rows:
+                            values.append(None)
+                break
+    return columns, rows > 0
+
+def column_chunks(columns):
+    """Splits a dict of column lists into polars DataFrames of up to CHUNK_SIZE rows."""
+    if columns:
+        yield from pl.DataFrame(columns).iter_slices(CHUNK_SIZE)
+
+def parse_log_file(file_path, patterns=None):
+    """
+    A generic log parser. This is a basic example.
+    Real-world log files can be very complex. This function tries each of the
+    given regex patterns (LOG_PATTERNS by default) against every line and
+    keeps the named groups of the first one that matches.
+    Large files are parsed in parallel across CPUs.
+    Yields DataFrames of up to CHUNK_SIZE rows.
+    """
+    if patterns is None:
+        patterns = LOG_PATTERNS
+    ranges = split_file(file_path)
+    matched = False
+    if len(ranges) > 1:
+        parse = functools.partial(parse_block, file_path, patterns)
+        with multiprocessing.Pool(min(len(ranges), os.cpu_count() or 1)) as pool:
+            for columns, block_matched in pool.imap(parse, ranges):
+                matched = matched or block_matched
+                yield from column_chunks(columns)
+        if not matched:
+            # Fallback for unstructured logs: treat each line as a single message.
+            # Whether any block matched is only known at the end, so large
+            # files are read a second time rather than held in memory.
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                messages = (line.strip() for line in f)
+                while batch := list(itertools.islice(messages, CHUNK_SIZE)):
+                    yield pl.DataFrame({'message': batch})
+    elif ranges:
+        # Files that fit in one block fall back to one message per line
+        # straight from the text that was already read.
+        columns, _ = parse_block(file_path, patterns, ranges[0], fallback=True)
+        yield from column_chunks(columns)
+
+def load_json_line(line):
+    """
+    Decodes one line of JSON with orjson, falling back to the json module for
+    the few things orjson rejects, such as NaN or integers over 64 bits.
+    """
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return json.loads(line)
 
 def parse_json_file(file_path):
     """
     Parses a JSON file. Handles both standard JSON and line-delimited JSON (JSONL).
+    Line-delimited files are streamed in DataFrames of up to CHUNK_SIZE rows.
     """
+    with open(file_path, 'rb') as f:
+        head = list(itertools.islice((line for line in f if line.strip()), 2))
+    if len(head) < 2 or head[0].lstrip().startswith(b'['):
+        # A JSON array, or anything on a single line, which could be a whole
+        # document rather than one record. Try it as standard JSON first, so
+        # pd.read_json shapes and types the columns as it always has.
+        try:
+            df = pd.read_json(file_path)
+        except ValueError:
+            pass
+        else:
+            yield df
+            return
+        with open(file_path, 'rb') as f:
+            yield from iter_chunks(load_json_line(line) for line in f)
+        return
+    rows = 0
     try:
-        # Try parsing as a standard JSON array of objects
-        df = pd.read_json(file_path)
-    except ValueError:
-        # If that fails, try parsing as line-delimited JSON
-        with open(file_path, 'r') as f:
-            data = [json.loads(line) for line in f]
-        df = pd.DataFrame(data)
-    return df
+        # Otherwise, try parsing as line-delimited JSON
+        with open(file_path, 'rb') as f:
+            for chunk in iter_chunks(load_json_line(line) for line in f):
+                rows += len(chunk)
+                yield chunk
+    except ValueError as error:
+        if rows:
+            raise
+        # Not line-delimited either, e.g. a single pretty-printed object.
+        try:
+            df = pd.read_json(file_path)
+        except ValueError:
+            raise error
+        yield df
 
 def parse_xml_file(file_path):
     """
     Parses an XML file. Assumes a structure where the root has many
-    child elements, and each child is a record.
+    child elements, and each child is a record. The file is streamed and the
+    records are collected column by column into DataFrames of up to
+    CHUNK_SIZE rows.
     """
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    data = []
-    for elem in root:
-        record = {child.tag: child.text for child in elem}
-        data.append(record)
-    return pd.DataFrame(data)
+    columns = {}
+    rows = 0
+    depth = 0
+    # Entities are left unresolved so an upload can't pull in local files.
+    for event, elem in etree.iterparse(file_path, events=('start', 'end'), resolve_entities=False):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        # Skip comments and processing instructions, whose tag isn't a string.
+        record = {child.tag: child.text for child in elem if isinstance(child.tag, str)}
+        for tag, text in record.items():
+            if tag not in columns:
+                columns[tag] = [None] * rows
+            columns[tag].append(text)
+        rows += 1
+        for values in columns.values():
+            if len(values) < rows:
+                values.append(None)
+        # Free the finished record and any siblings already processed.
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+        if rows >= CHUNK_SIZE:
+            yield pl.DataFrame(columns)
+            columns = {}
+            rows = 0
+    if rows:
+        yield pl.DataFrame(columns)
+
+def write_csv(chunks, csv_path):
+    """
+    Writes DataFrame chunks to a single CSV file and returns the number of
+    rows written. Chunks can be polars DataFrames (log and XML files, whose
+    values are all strings) or pandas ones (JSON, whose values can be of any
+    type). Columns first seen in a later chunk are appended to the header,
+    and the rows written before then are padded with empty fields.
+    """
+    columns = []
+    rows = 0
+    header_grew = False
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in chunks:
+            if len(chunk) == 0 or len(chunk.columns) == 0:
+                continue
+            new_columns = [c for c in chunk.columns if c not in columns]
+            if new_columns:
+                header_grew = header_grew or rows > 0
+                columns.extend(new_columns)
+            if isinstance(chunk, pl.DataFrame):
+                # Cast to strings first: a column that is empty in every
+                # record of the chunk comes out of polars as the Null type.
+                chunk = chunk.select([
+                    pl.col(c).cast(pl.Utf8) if c in chunk.columns else pl.lit(None, dtype=pl.Utf8).alias(c)
+                    for c in columns
+                ])
+                # Write empty values the way pandas does: polars quotes empty
+                # strings, while pandas leaves them bare and only writes ""
+                # when it is the row's only field.
+                if len(columns) == 1:
+                    chunk = chunk.fill_null('')
+                else:
+                    chunk = chunk.with_columns(pl.all().replace('', None))
+                chunk.write_csv(f, include_header=rows == 0)
+            else:
+                chunk.reindex(columns=columns).to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+    if header_grew:
+        # Rewrite the file with the final header, padding the shorter rows.
+        # Going through csv keeps quoted fields with newlines in one piece.
+        tmp_path = csv_path + '.tmp'
+        with open(csv_path, 'r', newline='', encoding='utf-8') as src, \
+             open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst, lineterminator=os.linesep)
+            next(reader)
+            writer.writerow(columns)
+            for row in reader:
+                writer.writerow(row + [''] * (len(columns) - len(row)))
+        os.replace(tmp_path, csv_path)
+    return rows
+
+# --- Background Jobs ---
+
+def process_file(upload_path, filename):
+    """
+    Parses an uploaded file and converts it into a CSV. Runs on an RQ worker,
+    so large files don't hold up a web request. Returns a dict with either
+    the csv_filename or an error message to show the user.
+    """
+    csv_path = None
+    try:
+        # Determine file type and parse accordingly
+        ext = filename.rsplit('.', 1)[1].lower()
+        chunks = None
+        if ext in ['log', 'txt']:
+            chunks = parse_log_file(upload_path)
+        elif ext == 'json':
+            chunks = parse_json_file(upload_path)
+        elif ext == 'xml':
+            chunks = parse_xml_file(upload_path)
+
+        # Create the output CSV, streaming the parsed chunks into it
+        base_filename = filename.rsplit('.', 1)[0]
+        csv_filename = f"{base_filename}.csv"
+        csv_path = os.path.join(app.config['PROCESSED_FOLDER'], csv_filename)
+        rows = write_csv(chunks, csv_path) if chunks is not None else 0
+
+        if not rows:
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+            return {'error': 'Could not parse the file. The format might be unsupported or the file is empty.'}
+        return {'csv_filename': csv_filename}
+
+    except Exception as e:
+        # Don't leave a CSV cut short by the error behind for download.
+        if csv_path and os.path.exists(csv_path):
+            os.remove(csv_path)
+        return {'error': f'An error occurred while processing the file: {e}'}
 
 # --- Flask Routes ---
 
@@ -84,7 +507,7 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    """Handles the file upload and processing logic."""
+    """Saves the uploaded file and queues it for processing."""
     if 'file' not in request.files:
         flash('No file part')
         return redirect(request.url)
@@ -96,46 +519,65 @@ def upload_file():
         return redirect(request.url)
 
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
+        # Prefix the file with the job id, so uploads with the same name
+        # don't overwrite each other's files while they wait in the queue.
+        job_id = uuid.uuid4().hex
+        filename = f"{job_id}_{secure_filename(file.filename)}"
         upload_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(upload_path)
 
         try:
-            # Determine file type and parse accordingly
-            ext = filename.rsplit('.', 1)[1].lower()
-            df = None
-            if ext in ['log', 'txt']:
-                df = parse_log_file(upload_path)
-            elif ext == 'json':
-                df = parse_json_file(upload_path)
-            elif ext == 'xml':
-                df = parse_xml_file(upload_path)
-
-            if df is None or df.empty:
-                flash('Could not parse the file. The format might be unsupported or the file is empty.')
-                return redirect(url_for('index'))
-
-            # Create the output CSV
-            base_filename = filename.rsplit('.', 1)[0]
-            csv_filename = f"{base_filename}.csv"
-            csv_path = os.path.join(app.config['PROCESSED_FOLDER'], csv_filename)
-            df.to_csv(csv_path, index=False)
-            
-            # Redirect to the results page
-            return render_template('results.html', csv_filename=csv_filename)
-
+            # Enqueued by name: workers can't import functions from __main__,
+            # which is where process_file lives when started with python app.py.
+            job = queue.enqueue('app.process_file', upload_path, filename,
+                                job_id=job_id, job_timeout=app.config['JOB_TIMEOUT'])
         except Exception as e:
-            flash(f'An error occurred while processing the file: {e}')
+            flash(f'Could not queue the file for processing: {e}')
             return redirect(url_for('index'))
 
+        # Show a page that waits for the job to finish
+        return render_template('pending.html', job_id=job.id)
+
     else:
         flash('File type not allowed.')
         return redirect(request.url)
 
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    """Reports the state of a processing job, polled by the pending page."""
+    try:
+        job = Job.fetch(job_id, connection=queue.connection)
+    except NoSuchJobError:
+        return jsonify({'status': 'missing'}), 404
+    return jsonify({'status': job.get_status().value})
+
+@app.route('/result/<job_id>')
+def job_result(job_id):
+    """Shows the results page once a processing job is done."""
+    try:
+        job = Job.fetch(job_id, connection=queue.connection)
+    except NoSuchJobError:
+        flash('That file is no longer being processed. Please upload it again.')
+        return redirect(url_for('index'))
+
+    status = job.get_status()
+    if status in ('queued', 'started', 'deferred', 'scheduled'):
+        return render_template('pending.html', job_id=job.id)
+    if status != 'finished':
+        flash('An error occurred while processing the file.')
+        return redirect(url_for('index'))
+
+    result = job.return_value()
+    if result.get('error'):
+        flash(result['error'])
+        return redirect(url_for('index'))
+    return render_template('results.html', csv_filename=result['csv_filename'])
+
 @app.route('/download/<filename>')
 def download_file(filename):
-    """Serves the processed CSV file for download."""
-    return send_from_directory(app.config['PROCESSED_FOLDER'], filename, as_attachment=True)
+    """Serves the processed CSV file for download, without its job id prefix."""
+    download_name = filename.split('_', 1)[-1]
+    return send_from_directory(app.config['PROCESSED_FOLDER'], filename, as_attachment=True, download_name=download_name)
 
 
 # --- Main Execution ---
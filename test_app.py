@@ -0,0 +1,139 @@
+import functools
+import mmap
+import re
+
+import app
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def to_csv(tmp_path, chunks):
+    csv_path = tmp_path / 'out.csv'
+    app.write_csv(chunks, str(csv_path))
+    return csv_path.read_text()
+
+
+def test_xml_empty_elements(tmp_path):
+    # <y></y> is None in every record of the chunk, which polars types as Null.
+    path = write(tmp_path, 'e.xml', '<r><a><x>1</x><y></y></a><a><x>2</x></a></r>')
+    assert to_csv(tmp_path, app.parse_xml_file(path)) == 'x,y\n1,\n2,\n'
+
+
+def test_xml_single_empty_column(tmp_path):
+    path = write(tmp_path, 'e.xml', '<r><a><x/></a><a><x>v</x></a></r>')
+    assert to_csv(tmp_path, app.parse_xml_file(path)) == 'x\n""\nv\n'
+
+
+# --- Log scanning ---
+
+APACHE = '1.2.3.4 - - [10/Oct/2000:13:55:36 -0700] "GET /a HTTP/1.0" 200 123'
+LEVEL_PATTERN = r'(?P<level>[A-Z]+): (?P<msg>.*)'
+
+LOG_TEXTS = {
+    'lf': f'{APACHE}\nnot a log line\n{APACHE.replace("200", "404")}\n',
+    'crlf': f'{APACHE}\r\nnoise\r\n{APACHE}\r\n',
+    'non_ascii': f'{APACHE}\n1.2.3.4 - - [x] "GET /café" 200 1\n',
+    'no_final_newline': f'noise\n{APACHE}',
+    'blank_lines': f'\n\n{APACHE}\n\n',
+    'empty_request': '1.2.3.4 - - [t] "" 200 1\n',
+    'levels': 'INFO: started\nWARN: \ndebug: lower\nERROR: a: b\n',
+    'levels_crlf': 'INFO: started\r\nERROR: a: b\r\n',
+    'levels_bare_cr': 'INFO: started\rERROR: a: b\n',
+    'levels_separators': 'INFO: a\x1cb\nERROR: \x85c\n',
+    # str patterns treat \x1c-\x1f as whitespace, bytes patterns don't.
+    'separators': f'1.2.3.4\x1c - - [t] "GET /" 200 1\n{APACHE}\n',
+}
+
+
+def reference_rows(path, pattern):
+    """Rows the way the original parser found them: line by line, in text mode."""
+    regex = re.compile(pattern)
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        return [m.groupdict() for m in map(regex.match, f) if m]
+
+
+def as_rows(columns):
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def test_line_scanner_rejects_patterns_that_can_leave_the_line():
+    assert app.line_scanner(app.LOG_PATTERNS[0]) is not None
+    assert app.line_scanner(LEVEL_PATTERN) is not None
+    assert app.line_scanner(r'(?P<a>\w+)\n(?P<b>\w+)') is None
+    assert app.line_scanner(r'(?P<a>[^x]+)') is None
+    assert app.line_scanner(r'(?s)(?P<a>.+)') is None
+    assert app.line_scanner(r'(?P<a>x*)') is None
+    assert app.line_scanner(r'(?P<a>café)') is None
+
+
+def test_parse_block_matches_line_by_line(tmp_path):
+    for name, text in LOG_TEXTS.items():
+        path = tmp_path / f'{name}.log'
+        path.write_bytes(text.encode('utf-8'))
+        for pattern in (app.LOG_PATTERNS[0], LEVEL_PATTERN):
+            columns, matched = app.parse_block(str(path), [pattern], (0, path.stat().st_size))
+            expected = reference_rows(str(path), pattern)
+            assert as_rows(columns) == expected, (name, pattern)
+            assert matched == bool(expected), (name, pattern)
+
+
+def test_scan_lines_matches_match_lines(tmp_path):
+    # Only ASCII blocks without \r are scanned, so compare on those directly.
+    for name in ('lf', 'no_final_newline', 'blank_lines', 'empty_request', 'levels'):
+        data = LOG_TEXTS[name].encode('ascii')
+        path = tmp_path / f'{name}.log'
+        path.write_bytes(data)
+        for pattern in (app.LOG_PATTERNS[0], LEVEL_PATTERN):
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                scanned = app.scan_lines(mm, 0, len(data), app.line_scanner(pattern))
+            assert scanned == app.match_lines(data.decode('ascii'), [pattern]), (name, pattern)
+
+
+def test_split_file_ranges_end_on_lines(tmp_path):
+    path = write(tmp_path, 'a.log', ''.join(f'line {i}\n' for i in range(100)) + 'last')
+    ranges = app.split_file(path, block_size=64)
+    data = open(path, 'rb').read()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b'\n'
+
+
+def parse_in_blocks(monkeypatch, path, block_size, patterns=None):
+    split_file = app.split_file
+    monkeypatch.setattr(app, 'split_file', lambda p: split_file(p, block_size=block_size))
+    return list(app.parse_log_file(path, patterns))
+
+
+def test_parse_log_file_in_blocks(tmp_path, monkeypatch):
+    # Mixes scanned blocks with ones that need match_lines (CRLF, non-ASCII).
+    text = ''.join(LOG_TEXTS[name] + '\n' for name in ('lf', 'crlf', 'non_ascii', 'blank_lines', 'levels', 'levels_crlf')) * 20
+    path = write(tmp_path, 'mixed.log', text)
+    for patterns in (None, [LEVEL_PATTERN]):
+        expected = to_csv(tmp_path, app.parse_log_file(path, patterns))
+        chunks = parse_in_blocks(monkeypatch, path, 200, patterns)
+        assert len(app.split_file(path)) > 1
+        assert to_csv(tmp_path, chunks) == expected
+        monkeypatch.undo()
+
+
+def test_parse_log_file_falls_back_to_messages_in_blocks(tmp_path, monkeypatch):
+    path = write(tmp_path, 'plain.log', ''.join(f'message {i}\r\n' for i in range(200)))
+    expected = 'message\n' + ''.join(f'message {i}\n' for i in range(200))
+    assert to_csv(tmp_path, app.parse_log_file(path)) == expected
+    assert to_csv(tmp_path, parse_in_blocks(monkeypatch, path, 256)) == expected
+
+
+# --- Background jobs ---
+
+def test_process_file_removes_partial_csv_on_error(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'PROCESSED_FOLDER', str(tmp_path))
+    # One row per chunk, so the bad line fails after rows were written.
+    monkeypatch.setattr(app, 'iter_chunks', functools.partial(app.iter_chunks, chunk_size=1))
+    path = write(tmp_path, 'bad.json', '{"a":1}\n{"a":2}\n{"a":3}\nnot json\n')
+    result = app.process_file(path, 'bad.json')
+    assert 'error' in result
+    assert not (tmp_path / 'bad.csv').exists()